@@ -6,10 +6,13 @@ Script to analyze all your network files with the network_metrics_package.
 import sys
 import os
 import glob
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add src to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+import numpy as np
 import graph_tool.all as gt
 from network_metrics_package.metrics.generator import compute_and_save_metrics
 from network_metrics_package.plotting.compare_plots import (
@@ -25,13 +28,52 @@ network_files = [
     "optimus_M2M1S1_plus.gt"
 ]
 
-def analyze_network_file(filepath, output_base_dir="your_networks_analysis"):
+def load_graph_cached(filepath, cache_dir):
+    """
+    Load a network file, reusing an edge-array cache on reruns.
+    
+    The first load parses the file with gt.load_graph and stores the topology
+    in cache_dir as <name>.edges.npy and <name>.meta.json. Later runs memory-map
+    the edge array and rebuild the graph with a single add_edge_list call.
+    The cache is ignored once the network file is newer than it. Only the
+    topology is cached; vertex/edge properties are not used by the metrics.
+    
+    Parameters:
+    filepath (str): Path to the network file
+    cache_dir (str): Directory for the cache files (e.g. the network's output directory)
+    """
+    base = os.path.join(cache_dir, os.path.splitext(os.path.basename(filepath))[0])
+    edges_path = base + ".edges.npy"
+    meta_path = base + ".meta.json"
+    
+    if (os.path.exists(edges_path) and os.path.exists(meta_path)
+            and os.path.getmtime(edges_path) >= os.path.getmtime(filepath)):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        edges = np.load(edges_path, mmap_mode='r')
+        g = gt.Graph(directed=meta['directed'])
+        if meta['n'] > 0:
+            g.add_vertex(meta['n'])
+        g.add_edge_list(edges)
+        return g
+    
+    g = gt.load_graph(filepath)
+    try:
+        np.save(edges_path, g.get_edges())
+        with open(meta_path, 'w') as f:
+            json.dump({'directed': g.is_directed(), 'n': g.num_vertices()}, f)
+    except OSError as e:
+        print(f"  Warning: could not write graph cache for {filepath}: {e}")
+    return g
+
+def analyze_network_file(filepath, output_base_dir="your_networks_analysis", nthreads=8):
     """
     Analyze a single network file.
     
     Parameters:
     filepath (str): Path to the network file
     output_base_dir (str): Base directory for all outputs
+    nthreads (int): OpenMP threads for graph-tool
     """
     # Extract prefix from filename
     prefix = os.path.splitext(os.path.basename(filepath))[0]
@@ -45,7 +87,7 @@ def analyze_network_file(filepath, output_base_dir="your_networks_analysis"):
     
     try:
         # Load the network
-        g = gt.load_graph(filepath)
+        g = load_graph_cached(filepath, output_dir)
         print(f"  Network loaded: {g.num_vertices()} vertices, {g.num_edges()} edges")
         
         # Compute metrics
@@ -55,6 +97,7 @@ def analyze_network_file(filepath, output_base_dir="your_networks_analysis"):
             out_dir=output_dir,
             prefix=prefix,
             normalize=True,
+            nthreads=nthreads,
             save_files=True
         )
         print(f"  Metrics saved to {npz_path} and {csv_path}")
@@ -108,15 +151,23 @@ def main():
     # Counter for successful analyses
     success_count = 0
     
-    # Analyze each network file
+    existing_files = []
     for network_file in network_files:
         if os.path.exists(network_file):
-            print(f"\nProcessing {network_file}...")
-            if analyze_network_file(network_file, base_output_dir):
-                success_count += 1
+            existing_files.append(network_file)
         else:
             print(f"\nWarning: {network_file} not found, skipping...")
     
+    # Analyze the files in parallel; split the cores between the workers so
+    # graph-tool's OpenMP threads don't oversubscribe the machine
+    if existing_files:
+        cpu_count = os.cpu_count() or 1
+        n_workers = max(1, min(len(existing_files), cpu_count // 2))
+        nthreads = max(1, cpu_count // n_workers)
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            futures = [ex.submit(analyze_network_file, f, base_output_dir, nthreads) for f in existing_files]
+            success_count = sum(1 for fut in as_completed(futures) if fut.result())
+    
     print("\n" + "=" * 50)
     print(f"Analysis complete! {success_count} out of {len(network_files)} networks processed successfully.")
     print(f"Results are in the '{base_output_dir}' directory, with each network in its own subdirectory.")
@@ -9,6 +9,8 @@ import os
 # Add src to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+import numpy as np
+import pandas as pd
 import graph_tool.all as gt
 
 def load_network_from_edgelist(filepath):
@@ -22,18 +24,17 @@ def load_network_from_edgelist(filepath):
     """
     g = gt.Graph()
     
-    # Read edges from file
-    edges = []
-    with open(filepath, 'r') as f:
-        for line in f:
-            if line.strip() and not line.startswith('#'):
-                parts = line.strip().split()
-                if len(parts) >= 2:
-                    edges.append((int(parts[0]), int(parts[1])))
+    # Read all edges in one pass with pandas' C parser; only the first two
+    # columns are used and lines with fewer than two fields are skipped
+    try:
+        df = pd.read_csv(filepath, sep=r'\s+', header=None, names=['source', 'target'],
+                         usecols=[0, 1], comment='#', on_bad_lines='skip')
+        edges = df.dropna().to_numpy(dtype=np.int64)
+    except pd.errors.EmptyDataError:
+        edges = np.empty((0, 2), dtype=np.int64)
     
-    # Add vertices (graph-tool will automatically create them when adding edges)
-    for source, target in edges:
-        g.add_edge(source, target)
+    # Add vertices and edges in a single call (vertices are created as needed)
+    g.add_edge_list(edges)
     
     print(f"Loaded network with {g.num_vertices()} vertices and {g.num_edges()} edges")
     return g
@@ -60,19 +61,15 @@ def create_network_from_adjacency_matrix(matrix_file):
     
     Expected format: CSV or similar with rows as source nodes and columns as target nodes.
     """
-    import numpy as np
-    
-    # Load matrix (assuming CSV format)
-    matrix = np.loadtxt(matrix_file, delimiter=',')
+    # Load matrix (assuming CSV format); pandas' C parser is much faster than np.loadtxt
+    matrix = pd.read_csv(matrix_file, header=None, dtype=float).to_numpy()
     
     g = gt.Graph()
     g.add_vertex(len(matrix))
     
     # Add edges based on adjacency matrix
-    for i in range(len(matrix)):
-        for j in range(len(matrix[i])):
-            if matrix[i][j] > 0:  # Assuming non-zero values indicate edges
-                g.add_edge(i, j)
+    rows, cols = np.nonzero(matrix > 0)  # Assuming non-zero values indicate edges
+    g.add_edge_list(np.column_stack([rows, cols]))
     
     print(f"Created network with {g.num_vertices()} vertices and {g.num_edges()} edges")
     return g
@@ -37,24 +37,29 @@ def create_sample_neural_network(n_neurons=1000, connection_prob=0.05):
     g.add_vertex(n_neurons)
     
     # Add edges (synaptic connections) with a small-world-like structure
-    np.random.seed(42)  # For reproducibility
-    
-    # First create a regular ring lattice for local connectivity
-    for i in range(n_neurons):
-        # Connect to nearby neurons (local connectivity)
-        for j in range(1, 6):  # Connect to 5 nearest neighbors on each side
-            if i + j < n_neurons:
-                g.add_edge(i, i + j)
-            if i - j >= 0:
-                g.add_edge(i, i - j)
+    rng = np.random.default_rng(42)  # For reproducibility
+    
+    # First create a regular ring lattice for local connectivity:
+    # connect every neuron to its 5 nearest neighbors on each side
+    i = np.arange(n_neurons)
+    offsets = np.arange(1, 6)
+    src = np.repeat(i, len(offsets))
+    off = np.tile(offsets, n_neurons)
+    fwd = src + off
+    bwd = src - off
+    local_edges = np.concatenate([
+        np.column_stack([src[fwd < n_neurons], fwd[fwd < n_neurons]]),
+        np.column_stack([src[bwd >= 0], bwd[bwd >= 0]]),
+    ])
     
     # Add some random long-range connections (similar to brain networks)
     n_random_edges = int(n_neurons * connection_prob * 20)
-    for _ in range(n_random_edges):
-        source = np.random.randint(0, n_neurons)
-        target = np.random.randint(0, n_neurons)
-        if source != target:
-            g.add_edge(source, target)
+    s = rng.integers(0, n_neurons, n_random_edges)
+    t = rng.integers(0, n_neurons, n_random_edges)
+    mask = s != t
+    random_edges = np.column_stack([s[mask], t[mask]])
+    
+    g.add_edge_list(np.concatenate([local_edges, random_edges]))
     
     print(f"Network created with {g.num_vertices()} vertices and {g.num_edges()} edges")
     return g
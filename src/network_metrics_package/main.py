@@ -19,6 +19,12 @@ def main():
     p.add_argument("--prefix", default="network", help="Prefix for output files")
     p.add_argument("--no-normalize", dest="normalize", action="store_false", help="Disable min-max normalization")
     p.add_argument("--threads", type=int, default=8, help="OpenMP threads for graph-tool")
+    p.add_argument("--component-workers", type=int, default=1, help="Processes for per-component metrics")
+    p.add_argument("--metric-workers", type=int, default=1, help="Metrics computed concurrently")
+    p.add_argument("--exact-betweenness", dest="betweenness_approx", action="store_false", help="Disable sampled betweenness on large graphs")
+    p.add_argument("--betweenness-eps", type=float, default=0.05, help="Sample-size parameter of approximate betweenness (> 0; smaller = more pivots)")
+    p.add_argument("--standard-closeness", dest="closeness_harmonic", action="store_false", help="Use classic instead of harmonic closeness")
+    p.add_argument("--parquet", dest="save_parquet", action="store_true", help="Also save metrics as Parquet (requires pyarrow)")
     args = p.parse_args()
 
     try:
@@ -27,7 +33,11 @@ def main():
         logger.error("Failed to load graph %s: %s", args.graph, e)
         return
 
-    compute_and_save_metrics(G, out_dir=args.out, prefix=args.prefix, normalize=args.normalize, nthreads=args.threads, save_files=True)
+    compute_and_save_metrics(G, out_dir=args.out, prefix=args.prefix, normalize=args.normalize, nthreads=args.threads, save_files=True,
+                             component_workers=args.component_workers, metric_workers=args.metric_workers,
+                             betweenness_approx=args.betweenness_approx, betweenness_eps=args.betweenness_eps,
+                             closeness_harmonic=args.closeness_harmonic,
+                             save_parquet=args.save_parquet)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
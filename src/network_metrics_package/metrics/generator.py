@@ -1,179 +1,378 @@
 import os
+import inspect
+import functools
+import multiprocessing
+import pickle
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
 import graph_tool.all as gt
-from .utils import sanitize_array, minmax_normalize
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; fall back to pandas for the CSV
+    pa = None
+from .utils import _finalize
 
 logger = logging.getLogger(__name__)
 
-def _metric_per_component_mapped(G, metric_callable):
+_CSV_WRITE_OPTIONS = None
+if pa is not None:
+    try:
+        _CSV_WRITE_OPTIONS = pacsv.WriteOptions(quoting_header="none")
+    except TypeError:  # older pyarrow always quotes the header; use pandas for the CSV
+        pass
+
+# graphs with more vertices than this use sampled betweenness when approximation is on
+_APPROX_BETWEENNESS_MIN_VERTICES = 5000
+
+def _eigenvector_call(g, w=None):
+    return gt.eigenvector(g, w if w is not None else None)
+
+def _katz_call(g, w=None):
+    return gt.katz(g, weight=w if w is not None else None)
+
+def _eigentrust_call(g, w=None):
+    return gt.eigentrust(g, w if w is not None else None)
+
+def _trust_transitivity_call(g, w=None):
+    vs = list(g.vertices())
+    if not vs:
+        return g.new_vertex_property("double")
+    try:
+        return gt.trust_transitivity(g, w if w is not None else None, source=vs[0])
+    except TypeError:
+        return gt.trust_transitivity(g, w if w is not None else None)
+
+def _accepts_weight(metric_callable):
+    """Whether metric_callable can be called as metric_callable(g, weight)."""
+    try:
+        params = list(inspect.signature(metric_callable).parameters.values())
+    except (TypeError, ValueError):
+        return True
+    positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    return (sum(p.kind in positional for p in params) >= 2
+            or any(p.kind == inspect.Parameter.VAR_POSITIONAL for p in params))
+
+def _component_values(G, vfilt_prop, vids, metric_callable, weight=None, accepts_weight=True):
+    """
+    Run metric_callable on the subgraph induced by vids and return its values
+    for vids (None if the metric fails). vfilt_prop is left all-False.
+    weight is an edge property map of G (or None) passed on to the metric if
+    accepts_weight (see _accepts_weight, probed once by the caller).
+    """
+    vfilt_prop.a[vids] = True
+    G_sub = gt.GraphView(G, vfilt=vfilt_prop)
+
+    # call metric on subgraph with the pre-probed signature
+    try:
+        res = metric_callable(G_sub, weight) if accepts_weight else metric_callable(G_sub)
+    except Exception:
+        res = None
+    # only clear this component instead of the whole filter
+    vfilt_prop.a[vids] = False
+
+    if res is None:
+        return None
+
+    # pick a vertex_property if returned in a tuple
+    if isinstance(res, tuple):
+        for item in reversed(res):
+            if hasattr(item, "a"):
+                res = item
+                break
+
+    if hasattr(res, "a"):
+        # property arrays are indexed by the parent graph's vertex index,
+        # so one gather replaces a per-vertex res[v] lookup
+        src = np.asarray(res.a, dtype=float)
+        return src[vids]
+
+    # plain sequences follow G_sub.vertices(), i.e. ascending index like vids
+    tmp = np.asarray(res, dtype=float).ravel()
+    vals = np.full(vids.size, np.nan)
+    n = min(tmp.size, vids.size)
+    vals[:n] = tmp[:n]
+    return vals
+
+def _component_chunk_worker(graph_bytes, weight_arr, metric_callable, vids_list, nthreads):
+    """Process-pool entry point: evaluate metric_callable on a chunk of components."""
+    G = pickle.loads(graph_bytes)
+    weight = None
+    if weight_arr is not None:
+        weight = G.new_edge_property("double")
+        weight.a = weight_arr
+    vfilt_prop = G.new_vertex_property("bool")
+    accepts_weight = _accepts_weight(metric_callable)
+    with gt.openmp_context(nthreads=nthreads):
+        return [(vids, _component_values(G, vfilt_prop, vids, metric_callable, weight, accepts_weight))
+                for vids in vids_list]
+
+def _balanced_chunks(components, n_chunks):
+    """Greedily split components into n_chunks with similar sum of size**1.5."""
+    chunks = [[] for _ in range(n_chunks)]
+    loads = np.zeros(n_chunks)
+    for vids in sorted(components, key=len, reverse=True):
+        i = int(np.argmin(loads))
+        chunks[i].append(vids)
+        loads[i] += vids.size ** 1.5
+    return [c for c in chunks if c]
+
+def _betweenness_pivots(n, eps, seed=42):
+    """
+    Uniformly sample ceil(ln(n) / eps**2) source vertices (pivots) for approximate
+    betweenness. eps only sets the sample size; no error bound is implied.
+    Returns None when the sample would not be smaller than n, i.e. exact
+    betweenness is as cheap.
+    """
+    if not eps > 0:
+        raise ValueError(f"betweenness eps must be positive, got {eps}")
+    k = int(np.ceil(np.log(n) / eps ** 2))
+    if k >= n:
+        return None
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n, size=k, replace=False))
+
+def _component_labels(G):
+    """Return (component label per vertex, size per component) as numpy arrays."""
+    comp_map, hist = gt.label_components(G)
+    return comp_map.get_array(), np.asarray(hist)
+
+def _metric_on_lcc_mapped(G, metric_callable, weight=None, comp_arr=None, sizes=None):
+    """
+    Compute metric_callable on the largest connected component only and map the
+    result back to a full-graph numpy array (NaN outside that component).
+    comp_arr/sizes may be passed in from _component_labels to avoid relabeling.
+    """
+    if comp_arr is None or sizes is None:
+        comp_arr, sizes = _component_labels(G)
+    arr = np.full(G.num_vertices(), np.nan, dtype=float)
+    if comp_arr.size == 0:
+        return arr
+
+    lcc = int(np.argmax(sizes))
+    vids = np.flatnonzero(comp_arr == lcc)
+    vfilt_prop = G.new_vertex_property("bool")
+    vals = _component_values(G, vfilt_prop, vids, metric_callable, weight, _accepts_weight(metric_callable))
+    if vals is not None:
+        arr[vids] = vals
+    return arr
+
+def _metric_per_component_mapped(G, metric_callable, weight=None, workers=1, nthreads=None,
+                                 comp_arr=None, sizes=None):
     """
     Compute metric_callable on every connected component (subgraph) and map results
     back to a full-graph numpy array (NaN for vertices where metric fails).
+
+    weight is an optional edge property map of G passed on to metric_callable.
+
+    With workers > 1 the components are spread over a process pool; metric_callable
+    must then be picklable (a module-level function) and each worker runs with
+    nthreads // workers OpenMP threads.
+
+    comp_arr/sizes may be passed in from _component_labels to avoid relabeling.
     """
     # component labels (integer per vertex)
-    comp_map = gt.label_components(G)[0].get_array()
-    uniq, counts = np.unique(comp_map, return_counts=True)
+    if comp_arr is None or sizes is None:
+        comp_arr, sizes = _component_labels(G)
     arr = np.full(G.num_vertices(), np.nan, dtype=float)
+    if comp_arr.size == 0:
+        return arr
 
-    # pre-create a reusable boolean vertex property
-    vfilt_prop = G.new_vertex_property("bool")
+    # group vertex ids by component with one stable sort: the vertices of
+    # component c are order[offsets[c]:offsets[c + 1]]
+    order = np.argsort(comp_arr, kind="stable")
+    offsets = np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
 
-    for comp_label in uniq:
+    components = []
+    for c in range(sizes.size):
         # select vertices in this component
-        vids = np.where(comp_map == comp_label)[0]
-        if vids.size == 0:
-            continue
-        # mark vfilt_prop True for vertices in this component
-        vfilt_prop.a[:] = False
-        vfilt_prop.a[vids] = True
-        G_sub = gt.GraphView(G, vfilt=vfilt_prop)
-
-        # prepare an edge-weight property for subgraph (size matches edges in subview)
-        try:
-            ew = G_sub.new_edge_property("double")
-            ew.a = np.random.random(ew.a.shape)
-        except Exception:
-            ew = G.new_edge_property("double")
-            ew.a = np.random.random(ew.a.shape)
+        vids = order[offsets[c]:offsets[c + 1]]
+        if vids.size:
+            components.append(vids)
 
-        # call metric on subgraph; handle call signatures
+    if workers > 1 and len(components) > 1:
+        n_chunks = min(workers, len(components))
+        worker_threads = max(1, (nthreads or os.cpu_count() or 1) // n_chunks)
         try:
-            res = metric_callable(G_sub, ew)
-        except TypeError:
-            try:
-                res = metric_callable(G_sub)
-            except Exception:
-                res = None
-        except Exception:
-            res = None
-
-        if res is None:
-            # leave NaNs for this component
-            continue
-
-        # pick a vertex_property if returned in a tuple
-        if isinstance(res, tuple):
-            for item in reversed(res):
-                if hasattr(item, "a"):
-                    res = item
-                    break
-
-        if hasattr(res, "a"):
-            for v in G_sub.vertices():
-                arr[int(v)] = float(res[v])
-        else:
-            tmp = np.asarray(res, dtype=float)
-            idxs = [int(v) for v in G_sub.vertices()]
-            for i, vid in enumerate(idxs):
-                if i < tmp.size:
-                    arr[vid] = float(tmp[i])
+            weight_arr = None
+            if weight is not None:
+                # the weights travel as a plain array indexed by edge index
+                if G.edge_index_range != G.num_edges():
+                    raise ValueError("edge indices are not contiguous")
+                weight_arr = np.asarray(weight.a, dtype=float)
+            graph_bytes = pickle.dumps(G)
+            # libgomp is not fork-safe and the parent has already run OpenMP
+            # regions (possibly from a metric thread), so never plain fork
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            with ProcessPoolExecutor(max_workers=n_chunks, mp_context=multiprocessing.get_context(method)) as ex:
+                futures = [ex.submit(_component_chunk_worker, graph_bytes, weight_arr, metric_callable, chunk, worker_threads)
+                           for chunk in _balanced_chunks(components, n_chunks)]
+                for fut in as_completed(futures):
+                    for vids, vals in fut.result():
+                        if vals is not None:
+                            arr[vids] = vals
+            return arr
+        except Exception as e:
+            logger.warning("parallel component evaluation failed, running sequentially: %s", e)
+
+    # pre-create a reusable boolean vertex property
+    vfilt_prop = G.new_vertex_property("bool")
+    accepts_weight = _accepts_weight(metric_callable)
+    for vids in components:
+        vals = _component_values(G, vfilt_prop, vids, metric_callable, weight, accepts_weight)
+        if vals is not None:
+            arr[vids] = vals
 
     return arr
 
-def compute_and_save_metrics(G, out_dir=".", prefix="network", normalize=True, nthreads=8, save_files=True):
+def compute_and_save_metrics(G, out_dir=".", prefix="network", normalize=True, nthreads=8, save_files=True,
+                             component_workers=1, weight=None, metric_workers=1,
+                             betweenness_approx=True, betweenness_eps=0.05,
+                             closeness_harmonic=True, save_parquet=False):
     """
     Return (metrics_dict, npz_path_or_None, csv_path_or_None)
-    metrics_dict: name -> numpy array (len == G.num_vertices())
+    metrics_dict: name -> numpy array (len == G.num_vertices(); float32 when normalized)
+    eigenvector, katz and eigentrust are computed on the largest component only.
+    component_workers: processes used for the per-component trust_transitivity (1 = sequential)
+    weight: optional edge property map used by eigenvector, katz and as the trust
+    map of eigentrust/trust_transitivity (uniform trust if None)
+    metric_workers: threads running independent metrics concurrently, each with
+    nthreads // metric_workers OpenMP threads (1 = sequential)
+    betweenness_approx: for graphs with more than 5000 vertices, estimate betweenness
+    from ln(N) / betweenness_eps**2 sampled source vertices instead of all N; the
+    cost drops proportionally (smaller eps = more pivots = slower but closer to
+    exact betweenness; the sample size is a heuristic, not an error guarantee)
+    closeness_harmonic: use harmonic closeness, which is well defined on disconnected
+    graphs
+    save_parquet: also write <prefix>_metrics.parquet (zstd, requires pyarrow)
     """
+    if betweenness_approx and not betweenness_eps > 0:
+        raise ValueError(f"betweenness_eps must be positive, got {betweenness_eps}")
     os.makedirs(out_dir, exist_ok=True)
     metrics = {}
-    logger.info("Computing metrics for graph with %d vertices, %d edges", G.num_vertices(), G.num_edges())
+    N = G.num_vertices()
+    E = G.num_edges()
+    _NAN = np.full(N, np.nan)
+    logger.info("Computing metrics for graph with %d vertices, %d edges", N, E)
 
+    # label components once; the LCC and per-component metrics all reuse it
     with gt.openmp_context(nthreads=nthreads):
-        try:
-            metrics['pagerank'] = sanitize_array(gt.pagerank(G).get_array())
-        except Exception as e:
-            logger.warning("pagerank failed: %s", e)
-            metrics['pagerank'] = np.full(G.num_vertices(), np.nan)
+        comp_arr, sizes = _component_labels(G)
 
-        try:
-            btw_vp, _ = gt.betweenness(G)
-            metrics['betweenness'] = sanitize_array(btw_vp.get_array())
-        except Exception as e:
-            logger.warning("betweenness failed: %s", e)
-            metrics['betweenness'] = np.full(G.num_vertices(), np.nan)
+    # the trust metrics require a trust map; default to uniform trust
+    trust = weight if weight is not None else G.new_edge_property("double", val=1.0)
 
-        try:
-            metrics['closeness'] = sanitize_array(gt.closeness(G).get_array())
-        except Exception as e:
-            logger.warning("closeness failed: %s", e)
-            metrics['closeness'] = np.full(G.num_vertices(), np.nan)
+    def _pagerank():
+        return {'pagerank': gt.pagerank(G).get_array()}
 
-        try:
-            # metrics['eigenvector'] = _metric_on_largest_component_mapped(G, lambda g, w=None: gt.eigenvector(g, w if w is not None else None))
-            metrics['eigenvector'] = _metric_per_component_mapped(G, lambda g, w=None: gt.eigenvector(g, w if w is not None else None))
-        except Exception as e:
-            logger.warning("eigenvector failed: %s", e)
-            metrics['eigenvector'] = np.full(G.num_vertices(), np.nan)
+    def _betweenness():
+        pivots = None
+        if betweenness_approx and N > _APPROX_BETWEENNESS_MIN_VERTICES:
+            pivots = _betweenness_pivots(N, betweenness_eps)
+            if pivots is not None:
+                logger.info("Approximating betweenness from %d of %d source vertices", pivots.size, N)
+        btw_vp, _ = gt.betweenness(G, pivots=pivots)
+        return {'betweenness': btw_vp.get_array()}
 
-        try:
-            # metrics['katz'] = _metric_on_largest_component_mapped(G, lambda g, w=None: gt.katz(g, weight=w if w is not None else None))
-            metrics['katz'] = _metric_per_component_mapped(G, lambda g, w=None: gt.katz(g, weight=w if w is not None else None))
-        except Exception as e:
-            logger.warning("katz failed: %s", e)
-            metrics['katz'] = np.full(G.num_vertices(), np.nan)
+    def _closeness():
+        return {'closeness': gt.closeness(G, harmonic=closeness_harmonic).get_array()}
 
-        try:
-            h_res = gt.hits(G)
-            if isinstance(h_res, tuple):
-                auth = next((x for x in h_res if hasattr(x, "a")), None)
-                hub = next((x for x in reversed(h_res) if hasattr(x, "a")), None)
-                metrics['hits_authority'] = sanitize_array(auth.get_array()) if auth is not None else np.full(G.num_vertices(), np.nan)
-                metrics['hits_hub'] = sanitize_array(hub.get_array()) if hub is not None else np.full(G.num_vertices(), np.nan)
-            else:
-                tmp = sanitize_array(np.asarray(h_res))
-                metrics['hits_authority'] = tmp
-                metrics['hits_hub'] = tmp
-        except Exception as e:
-            logger.warning("HITS failed: %s", e)
-            metrics['hits_authority'] = np.full(G.num_vertices(), np.nan)
-            metrics['hits_hub'] = np.full(G.num_vertices(), np.nan)
+    def _eigenvector():
+        return {'eigenvector': _metric_on_lcc_mapped(G, _eigenvector_call, weight, comp_arr, sizes)}
 
-        try:
-            # metrics['eigentrust'] = _metric_on_largest_component_mapped(G, lambda g, w=None: gt.eigentrust(g, w if w is not None else None))
-            metrics['eigentrust'] = _metric_per_component_mapped(G, lambda g, w=None: gt.eigentrust(g, w if w is not None else None))
-        except Exception as e:
-            logger.warning("eigentrust failed: %s", e)
-            metrics['eigentrust'] = np.full(G.num_vertices(), np.nan)
+    def _katz():
+        return {'katz': _metric_on_lcc_mapped(G, _katz_call, weight, comp_arr, sizes)}
 
-        def trust_call(g, w=None):
-            vs = list(g.vertices())
-            if not vs:
-                return g.new_vertex_property("double")
-            try:
-                return gt.trust_transitivity(g, w if w is not None else None, source=vs[0])
-            except TypeError:
-                return gt.trust_transitivity(g, w if w is not None else None)
+    def _hits():
+        h_res = gt.hits(G)
+        if isinstance(h_res, tuple):
+            auth = next((x for x in h_res if hasattr(x, "a")), None)
+            hub = next((x for x in reversed(h_res) if hasattr(x, "a")), None)
+            return {'hits_authority': auth.get_array() if auth is not None else _NAN.copy(),
+                    'hits_hub': hub.get_array() if hub is not None else _NAN.copy()}
+        tmp = np.asarray(h_res)
+        return {'hits_authority': tmp, 'hits_hub': tmp}
 
-        try:
-            # metrics['trust_transitivity'] = _metric_on_largest_component_mapped(G, trust_call)
-            metrics['trust_transitivity'] = _metric_per_component_mapped(G, trust_call)
-        except Exception as e:
-            logger.warning("trust_transitivity failed: %s", e)
-            metrics['trust_transitivity'] = np.full(G.num_vertices(), np.nan)
+    def _eigentrust():
+        return {'eigentrust': _metric_on_lcc_mapped(G, _eigentrust_call, trust, comp_arr, sizes)}
+
+    def _trust_transitivity(threads):
+        return {'trust_transitivity': _metric_per_component_mapped(G, _trust_transitivity_call, weight=trust, workers=component_workers, nthreads=threads,
+                                                                   comp_arr=comp_arr, sizes=sizes)}
+
+    # graph-tool releases the GIL, so with metric_workers > 1 the metrics
+    # overlap; split the OpenMP threads between them to avoid oversubscription
+    threads = max(1, nthreads // metric_workers) if metric_workers > 1 else nthreads
+
+    # (name used in warnings, metrics produced, function)
+    tasks = [
+        ("pagerank", ['pagerank'], _pagerank),
+        ("betweenness", ['betweenness'], _betweenness),
+        ("closeness", ['closeness'], _closeness),
+        ("eigenvector", ['eigenvector'], _eigenvector),
+        ("katz", ['katz'], _katz),
+        ("HITS", ['hits_authority', 'hits_hub'], _hits),
+        ("eigentrust", ['eigentrust'], _eigentrust),
+        # the process pool splits its OpenMP threads between workers
+        ("trust_transitivity", ['trust_transitivity'], functools.partial(_trust_transitivity, threads)),
+    ]
 
-    # sanitize lengths and normalize
-    for k, v in list(metrics.items()):
-        metrics[k] = sanitize_array(v)
-        if len(metrics[k]) != G.num_vertices():
-            arr = np.full(G.num_vertices(), np.nan)
-            arr[:min(len(metrics[k]), G.num_vertices())] = metrics[k][:min(len(metrics[k]), G.num_vertices())]
-            metrics[k] = arr
+    def _run(task):
+        name, keys, fn = task
+        # openmp_context only affects the calling thread, so set it per task
+        with gt.openmp_context(nthreads=threads):
+            try:
+                return fn()
+            except Exception as e:
+                logger.warning("%s failed: %s", name, e)
+                return {k: _NAN.copy() for k in keys}
+
+    if metric_workers > 1:
+        with ThreadPoolExecutor(max_workers=metric_workers) as ex:
+            futures = [ex.submit(_run, task) for task in tasks]
+            # collect in submission order to keep the column order stable
+            for fut in futures:
+                metrics.update(fut.result())
+    else:
+        for task in tasks:
+            metrics.update(_run(task))
 
-    if normalize:
-        for k in list(metrics.keys()):
-            metrics[k] = minmax_normalize(metrics[k])
+    # the raw metric arrays are sanitized only here: pad to N, sanitize and
+    # normalize each metric in a single pass; values in [0, 1] only feed
+    # plots and CSV, so float32 halves memory and file size
+    out_dtype = np.float32 if normalize else float
+    for k in list(metrics.keys()):
+        metrics[k] = _finalize(metrics[k], N, normalize, dtype=out_dtype)
 
     npz_path = csv_path = None
     if save_files:
         npz_path = os.path.join(out_dir, f"{prefix}_metrics.npz")
-        np.savez_compressed(npz_path, **metrics)
-        df = pd.DataFrame(metrics)
-        df.index.name = "vertex_id"
+        # uncompressed: zlib dominated save time and .npz is only a reload cache
+        np.savez(npz_path, **metrics)
         csv_path = os.path.join(out_dir, f"{prefix}_metrics.csv")
-        df.to_csv(csv_path, index=True)
+        # both CSV writers use an unquoted header and an empty field for NaN;
+        # the pandas fallback rounds floats to 6 significant digits
+        table = None
+        if pa is not None:
+            # from_pandas maps NaN to null, written as an empty field like pandas does
+            table = pa.table({"vertex_id": np.arange(N),
+                              **{k: pa.array(v, from_pandas=True) for k, v in metrics.items()}})
+        if table is not None and _CSV_WRITE_OPTIONS is not None:
+            pacsv.write_csv(table, csv_path, _CSV_WRITE_OPTIONS)
+        else:
+            df = pd.DataFrame(metrics)
+            df.index.name = "vertex_id"
+            df.to_csv(csv_path, index=True, float_format="%.6g", chunksize=1 << 16)
+        if save_parquet:
+            if table is not None:
+                parquet_path = os.path.join(out_dir, f"{prefix}_metrics.parquet")
+                pq.write_table(table, parquet_path, compression="zstd")
+                logger.info("Saved metrics to %s", parquet_path)
+            else:
+                logger.warning("pyarrow is not installed, skipping Parquet output")
         logger.info("Saved metrics to %s and %s", npz_path, csv_path)
 
     return metrics, npz_path, csv_path
\ No newline at end of file
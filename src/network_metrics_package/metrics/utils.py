@@ -1,34 +1,94 @@
 import numpy as np
 import logging
 
+try:
+    import numba
+except ImportError:  # numba is optional; fall back to plain NumPy
+    numba = None
+
 logger = logging.getLogger(__name__)
 
-def sanitize_array(arr):
-    """Convert input to numpy float array and replace +/-inf with nan.
-    Accept graph-tool vertex property objects (has .get_array or .a)."""
+def _to_float_array(arr, dtype=float):
+    """Convert input to a numpy float array without touching its values."""
     try:
         if hasattr(arr, "get_array"):
-            a = np.asarray(arr.get_array(), dtype=float)
+            return np.asarray(arr.get_array(), dtype=dtype)
         elif hasattr(arr, "a"):
-            a = np.asarray(arr.a, dtype=float)
-        else:
-            a = np.asarray(arr, dtype=float)
+            return np.asarray(arr.a, dtype=dtype)
+        return np.asarray(arr, dtype=dtype)
     except Exception:
         # fallback to best-effort conversion
-        a = np.asarray(arr, dtype=float)
+        return np.asarray(arr, dtype=dtype)
+
+def sanitize_array(arr, dtype=float):
+    """Convert input to numpy float array (of the given dtype) and replace +/-inf with nan.
+    Accept graph-tool vertex property objects (has .get_array or .a)."""
+    a = _to_float_array(arr, dtype)
     a[~np.isfinite(a)] = np.nan
     return a
 
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _sanitize_and_normalize(a_in, a_out):
+        """Write min-max normalized a_in to a_out; non-finite values become nan."""
+        n = a_in.size
+        mn = np.inf
+        mx = -np.inf
+        for i in numba.prange(n):
+            x = a_in[i]
+            if np.isfinite(x):
+                mn = min(mn, x)
+                mx = max(mx, x)
+        span = mx - mn
+        for i in numba.prange(n):
+            x = a_in[i]
+            if not np.isfinite(x):
+                a_out[i] = np.nan
+            elif span == 0.0:
+                a_out[i] = 0.0
+            else:
+                a_out[i] = (x - mn) / span
+else:
+    _sanitize_and_normalize = None
+
 def minmax_normalize(arr):
     """Min-max normalize 1D array, preserving nan values."""
-    a = sanitize_array(arr)
-    valid = ~np.isnan(a)
-    if not np.any(valid):
-        return a
-    mn = np.nanmin(a)
-    mx = np.nanmax(a)
-    if mx == mn:
-        a[valid] = 0.0
+    if _sanitize_and_normalize is not None:
+        a = np.ascontiguousarray(_to_float_array(arr))
+        if a.ndim == 1:
+            out = np.empty_like(a)
+            _sanitize_and_normalize(a, out)
+            return out
+
+    a = _to_float_array(arr)
+    # one finiteness mask drives both reductions and the final nan fill
+    finite = np.isfinite(a)
+    if not finite.any():
+        a[...] = np.nan
         return a
-    a[valid] = (a[valid] - mn) / (mx - mn)
-    return a
\ No newline at end of file
+    mn = np.min(a, where=finite, initial=np.inf)
+    mx = np.max(a, where=finite, initial=-np.inf)
+    scale = 1.0 / (mx - mn) if mx != mn else 0.0
+    # in-place ufuncs avoid the temporaries of masked fancy indexing
+    np.subtract(a, mn, out=a, where=finite)
+    np.multiply(a, scale, out=a, where=finite)
+    a[~finite] = np.nan
+    return a
+
+def _finalize(arr, n, normalize=True, dtype=float):
+    """Return arr as a length-n float array (truncated or nan-padded) with
+    non-finite values as nan, min-max normalized if requested, cast to dtype.
+    The data is copied once and sanitized once (fused with normalization
+    when Numba is available)."""
+    a = _to_float_array(arr).ravel()
+    out = np.full(n, np.nan)
+    m = min(a.size, n)
+    out[:m] = a[:m]
+    if not normalize:
+        out[~np.isfinite(out)] = np.nan
+    elif _sanitize_and_normalize is not None:
+        # the kernel reads each element before writing it, so in-place is safe
+        _sanitize_and_normalize(out, out)
+    else:
+        out = minmax_normalize(out)
+    return out.astype(dtype, copy=False)
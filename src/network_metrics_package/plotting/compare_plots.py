@@ -1,31 +1,192 @@
 import os
+import math
+import multiprocessing
+import struct
+import zipfile
+from collections.abc import Mapping
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # file output only; also safe in forked worker processes
 import matplotlib.colors
 import matplotlib.ticker
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import seaborn as sns
+import scipy.stats
 from matplotlib import cbook
 
-
 sns.set(style="whitegrid")
 
+# one reusable figure per figsize, cleared before each plot; the figures
+# are drawn on their own Agg canvas and never registered with pyplot
+_FIG_CACHE = {}
+
+
+def _get_figure(figsize, out=None):
+    """Return a figure of the given size and a fresh axes on it.
+    Plots written to out reuse a cleared cached figure; without out a new pyplot
+    figure is made current so the caller can show it or pass it to save_plot."""
+    if not out:
+        fig = plt.figure(figsize=figsize)
+        return fig, fig.add_subplot(111)
+    key = tuple(figsize)
+    fig = _FIG_CACHE.get(key)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _FIG_CACHE[key] = fig
+    fig.clear()
+    return fig, fig.add_subplot(111)
+
+def _mmap_npz_member(npz_path, zf, member):
+    """Memory-map an uncompressed .npy member of an .npz archive.
+    Returns None when the member cannot be mapped (compressed, object or empty)."""
+    info = zf.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(npz_path, 'rb') as fh:
+        # the member data starts after its local file header
+        fh.seek(info.header_offset)
+        name_len, extra_len = struct.unpack('<HH', fh.read(30)[26:30])
+        fh.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(fh)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fh)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fh)
+        offset = fh.tell()
+    if dtype.hasobject or 0 in shape:
+        return None
+    return np.memmap(npz_path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def _float_array(x):
+    """1D float array of x for plotting: floating-point input is downcast to
+    float32, anything else (e.g. integer counts) becomes float64."""
+    a = np.asarray(x)
+    return np.asarray(a, dtype=np.float32 if np.issubdtype(a.dtype, np.floating) else np.float64).ravel()
+
+
+class _LazyMetrics(Mapping):
+    """Read-only metric mapping over an .npz file; each array is loaded on first access.
+    Uncompressed members (as written by np.savez) are memory-mapped. close() (or
+    leaving a with block) closes the archive; arrays already returned stay valid."""
+
+    def __init__(self, npz_path):
+        self._path = npz_path
+        self._npz = np.load(npz_path)
+        self._cache = {}
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            if key not in self._npz.files:
+                raise KeyError(key)
+            try:
+                arr = _mmap_npz_member(self._path, self._npz.zip, key + '.npy')
+            except (KeyError, ValueError, OSError):
+                arr = None
+            self._cache[key] = arr if arr is not None else self._npz[key]
+        return self._cache[key]
+
+    def __iter__(self):
+        return iter(self._npz.files)
+
+    def __len__(self):
+        return len(self._npz.files)
+
+    def close(self):
+        self._npz.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def load_metrics(npz_path):
-    data = np.load(npz_path)
-    return {k: data[k] for k in data.files}
+    """Return the metrics in npz_path as a mapping that loads arrays on access.
+    The mapping can be used as a context manager to close the file."""
+    return _LazyMetrics(npz_path)
+
+
+def adjacent_values(vmin, vmax, q1, q3):
+    upper_adjacent_value = q3 + (q3 - q1) * 1.5
+    upper_adjacent_value = min(max(upper_adjacent_value, q3), vmax)
+    lower_adjacent_value = q1 - (q3 - q1) * 1.5
+    lower_adjacent_value = min(max(lower_adjacent_value, vmin), q1)
+    return lower_adjacent_value, upper_adjacent_value
+
+
+# below this many values plain Python beats NumPy's per-call overhead
+_TINY_N = 16
+
+
+def _quartiles_whiskers(d):
+    """Return (q1, median, q3, lower whisker, upper whisker) of 1D data.
+    Quartiles use the same linear interpolation as np.percentile, read off
+    a partial partition instead of a full sort."""
+    n = d.size
+    if n < _TINY_N:
+        s = sorted(d.tolist())
+        qs = []
+        for i in (1, 2, 3):
+            pos = 0.25 * i * (n - 1)
+            lo = int(pos)
+            hi = min(lo + 1, n - 1)
+            qs.append(s[lo] + (s[hi] - s[lo]) * (pos - lo))
+        q1, med, q3 = qs
+        lower, upper = adjacent_values(s[0], s[-1], q1, q3)
+        return q1, med, q3, lower, upper
+    pos = 0.25 * np.arange(1, 4) * (n - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    part = np.partition(d, np.union1d(lo, hi))
+    q1, med, q3 = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    lower, upper = adjacent_values(d.min(), d.max(), q1, q3)
+    return q1, med, q3, lower, upper
+
+
+def _metrics_frame(metrics_dict, metric_names):
+    """DataFrame with one float column per metric; shorter metrics are NaN-padded."""
+    return pd.DataFrame({k: pd.Series(_float_array(metrics_dict[k]))
+                         for k in metric_names})
+
+
+def _spearman_corr(mat):
+    """Spearman correlation of the columns of mat: Pearson correlation of the ranks."""
+    try:
+        ranks = scipy.stats.rankdata(mat, axis=0, method='average')
+    except TypeError:  # SciPy without the axis argument ranks one column at a time
+        ranks = np.apply_along_axis(scipy.stats.rankdata, 0, mat)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.corrcoef(ranks, rowvar=False)
+
+
+def _corr_frame(df, valid_cols):
+    """Spearman correlation DataFrame over the rows of df where all valid_cols are set.
+    Returns None if no such row exists."""
+    # float32 metrics are upcast here so ranks and correlations are exact
+    mat = np.column_stack([df[c].to_numpy(dtype=np.float64) for c in valid_cols])
+    mat = mat[~np.isnan(mat).any(axis=1)]
+    if len(mat) == 0:
+        return None
+    vals = np.atleast_2d(_spearman_corr(mat))
+    vals[~np.isfinite(vals)] = 0.0
+    # Ensure the correlation matrix is symmetric by mirroring the upper triangle
+    iu = np.triu_indices_from(vals, k=1)
+    vals[iu[1], iu[0]] = vals[iu]
+    np.fill_diagonal(vals, 1.0)
+    return pd.DataFrame(vals, index=valid_cols, columns=valid_cols)
 
 
 def plot_violin(metrics_dict, metric_names=None, title="Metric correlation", out=None, figsize=(10,8)):
     if metric_names is None:
         metric_names = list(metrics_dict.keys())
         
-    def adjacent_values(vals, q1, q3):
-        upper_adjacent_value = q3 + (q3 - q1) * 1.5
-        upper_adjacent_value = np.clip(upper_adjacent_value, q3, vals[-1])
-        lower_adjacent_value = q1 - (q3 - q1) * 1.5
-        lower_adjacent_value = np.clip(lower_adjacent_value, vals[0], q1)
-        return lower_adjacent_value, upper_adjacent_value
-        
     def set_axis_style(ax, labels):
         ax.set_xticks(np.arange(1, len(labels) + 1), labels=labels)
         ax.set_xlim(0.25, len(labels) + 0.75)
@@ -34,33 +195,35 @@ def plot_violin(metrics_dict, metric_names=None, title="Metric correlation", out
     
     # Filter out metrics with no valid data and ensure all arrays are proper 1D arrays
     valid_metrics = {}
+    positive_metrics = {}
     valid_metric_names = []
     
     for name in metric_names:
         try:
             # Get the data and convert to numpy array
-            data = np.array(metrics_dict[name])
+            data = np.asarray(metrics_dict[name])
             
             # Handle object arrays (arrays with inhomogeneous shapes)
             if data.dtype == object:
                 # Flatten all elements and combine into a single 1D array
-                flattened = []
-                for item in data.flat:
-                    if isinstance(item, (list, tuple, np.ndarray)):
-                        flattened.extend(np.asarray(item).flatten())
-                    else:
-                        flattened.append(item)
-                data = np.array(flattened, dtype=float)
+                parts = [np.asarray(item, dtype=np.float32).ravel() if isinstance(item, (list, tuple, np.ndarray))
+                         else np.float32(item) for item in data.flat]
+                data = np.concatenate([p if p.ndim else p[None] for p in parts]) if parts else np.empty(0)
             else:
-                # For regular arrays, just flatten to 1D
-                data = data.flatten()
+                # For regular arrays, flatten to 1D (float32, like the object branch)
+                data = _float_array(data)
             
-            # Remove NaN values
-            data = data[~np.isnan(data)]
+            # Remove NaN and infinite values in one pass, then pick out the
+            # positive values once for the log-scale check and transform
+            if data.size < _TINY_N:
+                data = np.array([x for x in data.tolist() if math.isfinite(x)], dtype=data.dtype)
+            else:
+                data = data[np.isfinite(data)]
             
             # Only include metrics with at least one valid value
             if len(data) > 0:
                 valid_metrics[name] = data
+                positive_metrics[name] = data[data > 0]
                 valid_metric_names.append(name)
         except Exception as e:
             print(f"Warning: Could not process metric {name}: {e}")
@@ -71,55 +234,36 @@ def plot_violin(metrics_dict, metric_names=None, title="Metric correlation", out
         print("No valid data for violin plot")
         return
     
-    # Prepare data for violin plot - ensure each dataset is a proper 1D array
-    data_list = []
-    for name in valid_metric_names:
-        metric_data = valid_metrics[name]
-        # Make sure it's a proper 1D array of finite values
-        if metric_data.ndim > 1:
-            metric_data = metric_data.flatten()
-        
-        # Filter out infinite values as well as NaN
-        metric_data = metric_data[np.isfinite(metric_data)]
-        
-        if len(metric_data) > 0:
-            data_list.append(metric_data)
-        else:
-            print(f"Warning: No finite data for metric {name}")
-    
-    # If no data left after filtering, exit
-    if not data_list:
-        print("No valid finite data for violin plot")
-        return
+    # Each dataset is already a 1D array of finite values
+    data_list = [valid_metrics[name] for name in valid_metric_names]
+    positive_list = [positive_metrics[name] for name in valid_metric_names]
     
     # Check if we should use log scale based on data range
     try:
-        # Concatenate all data to check range
-        all_data = np.concatenate(data_list)
-        # Only consider positive values for log scaling
-        positive_data = all_data[all_data > 0]
+        # Only consider positive values for log scaling, reduced per metric
+        nonempty = [d for d in positive_list if len(d) > 0]
         use_log_scale = False
-        if len(positive_data) > 0:
-            data_range = np.log10(np.max(positive_data)) - np.log10(np.min(positive_data))
-            use_log_scale = data_range > 2  # Use log scale if data spans more than 2 orders of magnitude
+        if nonempty:
+            pos_max = max(d.max() for d in nonempty)
+            pos_min = min(d.min() for d in nonempty)
+            use_log_scale = pos_max > 100 * pos_min  # Use log scale if data spans more than 2 orders of magnitude
         
         # Transform data for log scale if needed
         if use_log_scale:
             transformed_data = []
-            for d in data_list:
-                positive_d = d[d > 0]
+            for positive_d in positive_list:
                 if len(positive_d) > 0:
                     # Use log1p instead of log10 to avoid negative values for small positive numbers
                     transformed_data.append(np.log1p(positive_d))
                 else:
                     # If no positive values, create a small array with a default value
-                    transformed_data.append(np.array([0]))
+                    transformed_data.append(np.array([0.0]))
             data_list = transformed_data
     except Exception as e:
         print(f"Warning: Could not determine log scaling: {e}")
         use_log_scale = False
 
-    fig, ax = plt.subplots(figsize=figsize)
+    fig, ax = _get_figure(figsize, out)
     
     # Create violin plots for each metric individually
     try:
@@ -135,13 +279,11 @@ def plot_violin(metrics_dict, metric_names=None, title="Metric correlation", out
         whiskers = []
         
         for d in data_list:
-            q1, med, q3 = np.percentile(d, [25, 50, 75])
+            # Partition rather than sort; only three order statistics are needed
+            q1, med, q3, lower_whisker, upper_whisker = _quartiles_whiskers(d)
             quartile1.append(q1)
             medians.append(med)
             quartile3.append(q3)
-            
-            # Calculate whiskers
-            lower_whisker, upper_whisker = adjacent_values(np.sort(d), q1, q3)
             whiskers.append([lower_whisker, upper_whisker])
             
         quartile1 = np.array(quartile1)
@@ -170,55 +312,54 @@ def plot_violin(metrics_dict, metric_names=None, title="Metric correlation", out
         
         ax.set_title('Violin plot')
         
-        plt.tight_layout()
-        if out: plt.savefig(out); plt.close()
+        fig.tight_layout()
+        if out: fig.canvas.print_png(out)
     except Exception as e:
         print(f"Error creating violin plot: {e}")
         import traceback
         traceback.print_exc()
-        plt.close()
 
 def plot_box(metrics_dict, metric_names=None, title="Metric correlation (boxplot)", out=None, figsize=(10,8)):
     if metric_names is None:
         metric_names = list(metrics_dict.keys())
     
-    df = pd.DataFrame({k: metrics_dict[k] for k in metric_names})
     np.random.seed(19680801)
     
-    # Process data to ensure all arrays have the same length
+    # Work on each metric array directly; they may have different lengths
     used_data = []
     valid_metric_names = []
     for k in metric_names:
-        series = df[k].dropna()
-        if len(series) > 0:
-            used_data.append(np.array(series))
+        arr = _float_array(metrics_dict[k])
+        arr = arr[~np.isnan(arr)]
+        if len(arr) > 0:
+            used_data.append(arr)
             valid_metric_names.append(k)
     
     if not used_data:
         print("No valid data for box plot")
         return
     
-    # Check if we should use log scale based on data range
-    all_data = np.concatenate(used_data)
-    # Only consider positive values for log scaling
-    positive_data = all_data[all_data > 0]
+    # Check if we should use log scale based on data range, reducing each
+    # metric's positive values separately rather than concatenating them
+    positive_list = [data[data > 0] for data in used_data]
+    nonempty = [d for d in positive_list if len(d) > 0]
     use_log_scale = False
-    if len(positive_data) > 0:
-        data_range = np.log10(np.max(positive_data)) - np.log10(np.min(positive_data))
-        use_log_scale = data_range > 2  # Use log scale if data spans more than 2 orders of magnitude
+    if nonempty:
+        pos_max = max(d.max() for d in nonempty)
+        pos_min = min(d.min() for d in nonempty)
+        use_log_scale = pos_max > 100 * pos_min  # Use log scale if data spans more than 2 orders of magnitude
     
     # Transform data for log scale if needed
     if use_log_scale:
         transformed_data = []
-        for data in used_data:
-            positive_data = data[data > 0]
+        for positive_data in positive_list:
             if len(positive_data) > 0:
                 transformed_data.append(np.log10(positive_data))
             else:
                 transformed_data.append(np.array([0]))
         used_data = transformed_data
     
-    fig, ax = plt.subplots(figsize=figsize)
+    fig, ax = _get_figure(figsize, out)
     ax.set_title("Metric distributions")
     ax.set_xlabel("Metric")
     
@@ -242,29 +383,29 @@ def plot_box(metrics_dict, metric_names=None, title="Metric correlation (boxplot
         ax.set_ylabel('Value')
     
     ax.set_xticklabels(valid_metric_names, rotation=45, ha='right')
-    plt.tight_layout()
-    if out: plt.savefig(out); plt.close()
+    fig.tight_layout()
+    if out: fig.canvas.print_png(out)
     
 def plot_heatmap_corr(metrics_dict, metric_names=None, title="Metric correlation (heatmap)", out=None, figsize=(8,8), annot=False):
     if metric_names is None:
         metric_names = list(metrics_dict.keys())
-    df = pd.DataFrame({k: metrics_dict[k] for k in metric_names})
+    df = _metrics_frame(metrics_dict, metric_names)
     
     # Filter out columns with no valid data
-    valid_cols = [c for c in df.columns if df[c].notna().any() and (df[c].std() > 0 or np.nanstd(df[c]) > 0)]
+    stds = df.std(skipna=True, ddof=0)
+    valid_cols = df.columns[(stds > 0) & df.notna().any()].tolist()
     if len(valid_cols) == 0:
         print("No valid columns for heatmap")
         return
     elif len(valid_cols) == 1:
         print("Only one valid column for heatmap")
         # Create a 1x1 heatmap
-        df_single = df[[valid_cols[0]]].to_frame()
-        corr = df_single.corr(method='spearman')
-        fig, ax = plt.subplots(figsize=figsize)
-        sns.heatmap(corr, annot=annot, cmap="vlag", center=0, square=True, linewidths=.5)
-        plt.title(title)
-        plt.tight_layout()
-        if out: plt.savefig(out); plt.close()
+        corr = pd.DataFrame([[1.0]], index=valid_cols, columns=valid_cols)
+        fig, ax = _get_figure(figsize, out)
+        sns.heatmap(corr, annot=annot, cmap="vlag", center=0, square=True, linewidths=.5, ax=ax)
+        ax.set_title(title)
+        fig.tight_layout()
+        if out: fig.canvas.print_png(out)
         return
         
     df = df.loc[:, valid_cols]
@@ -272,29 +413,26 @@ def plot_heatmap_corr(metrics_dict, metric_names=None, title="Metric correlation
     # Remove rows with all NaN values
     df = df.dropna(how='all')
     
-    if len(df) == 0:
+    corr = _corr_frame(df, valid_cols) if len(df) > 0 else None
+    if corr is None:
         print("No valid rows for heatmap")
         return
     
-    corr = df.corr(method='spearman')
-    corr = corr.replace([np.inf, -np.inf], np.nan).fillna(0.0)
-    corr = (corr + corr.T) / 2.0
-    np.fill_diagonal(corr.values, 1.0)
-    
-    fig, ax = plt.subplots(figsize=figsize)
-    sns.heatmap(corr, annot=annot, cmap="vlag", center=0, square=True, linewidths=.5)
-    plt.title(title)
-    plt.tight_layout()
-    if out: plt.savefig(out); plt.close()
+    fig, ax = _get_figure(figsize, out)
+    sns.heatmap(corr, annot=annot, cmap="vlag", center=0, square=True, linewidths=.5, ax=ax)
+    ax.set_title(title)
+    fig.tight_layout()
+    if out: fig.canvas.print_png(out)
 
 
 def plot_clustermap(metrics_dict, metric_names=None, title="Metric clustermap", out=None, figsize=(10,10)):
     if metric_names is None:
         metric_names = list(metrics_dict.keys())
-    df = pd.DataFrame({k: metrics_dict[k] for k in metric_names})
+    df = _metrics_frame(metrics_dict, metric_names)
     
     # Filter out columns with no valid data
-    valid_cols = [c for c in df.columns if df[c].notna().any() and (df[c].std() > 0 or np.nanstd(df[c]) > 0)]
+    stds = df.std(skipna=True, ddof=0)
+    valid_cols = df.columns[(stds > 0) & df.notna().any()].tolist()
     if len(valid_cols) == 0:
         print("No valid columns for clustermap")
         return
@@ -307,18 +445,12 @@ def plot_clustermap(metrics_dict, metric_names=None, title="Metric clustermap",
     # Remove rows with all NaN values
     df = df.dropna(how='all')
     
-    if len(df) == 0:
+    # Compute correlation matrix, handling NaN values
+    corr = _corr_frame(df, valid_cols) if len(df) > 0 else None
+    if corr is None:
         print("No valid rows for clustermap")
         return
     
-    # Compute correlation matrix, handling NaN values
-    corr = df.corr(method='spearman')
-    corr = corr.replace([np.inf, -np.inf], np.nan).fillna(0.0)
-    
-    # Ensure the correlation matrix is symmetric
-    corr = (corr + corr.T) / 2.0
-    np.fill_diagonal(corr.values, 1.0)
-    
     try:
         cg = sns.clustermap(corr, cmap="vlag", figsize=figsize, annot=True)
         plt.suptitle(title)
@@ -326,89 +458,64 @@ def plot_clustermap(metrics_dict, metric_names=None, title="Metric clustermap",
             cg.savefig(out)
             plt.close()
     except Exception as e:
-        plt.figure(figsize=figsize)
-        sns.heatmap(corr, annot=True, cmap="vlag", center=0)
-        plt.title(title + " (fallback heatmap)")
+        fig, ax = _get_figure(figsize, out)
+        sns.heatmap(corr, annot=True, cmap="vlag", center=0, ax=ax)
+        ax.set_title(title + " (fallback heatmap)")
         if out:
-            plt.savefig(out)
-            plt.close()
+            fig.canvas.print_png(out)
 
 
 def save_plot(filename):
     plt.savefig(filename)
     plt.close()
 
+# (plots entry, plot function, file suffix, extra keyword arguments, label for errors)
+_PLOT_KINDS = (
+    ("violin", plot_violin, "_violin.png", {}, "violin plot"),
+    ("box", plot_box, "_box.png", {}, "box plot"),
+    ("heatmap", plot_heatmap_corr, "_corr_heatmap.png", {"annot": True}, "heatmap"),
+    ("clustermap", plot_clustermap, "_clustermap.png", {}, "clustermap"),
+)
+
+
+def _dispatch_plots(metrics, base_name, out_dir, plots):
+    """Write each requested plot of metrics to out_dir, reporting failures per plot."""
+    for kind, fn, suffix, kwargs, label in _PLOT_KINDS:
+        if kind not in plots:
+            continue
+        try:
+            fn(metrics, out=os.path.join(out_dir, base_name + suffix), **kwargs)
+        except Exception as e:
+            print(f"Error creating {label} for {base_name}: {e}")
+
+def _process_one(npz_path, out_dir, plots):
+    base_name = os.path.splitext(os.path.basename(npz_path))[0]
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        metrics = load_metrics(npz_path)
+    except Exception as e:
+        print(f"Error loading metrics from {npz_path}: {e}")
+        return
+    with metrics:
+        _dispatch_plots(metrics, base_name, out_dir, plots)
+
 def main(npz_path=None, out_dir="metrics_out", plots=None):
+    if plots is None:
+        plots = ["violin", "box", "heatmap", "clustermap"]
+
     if npz_path is None:
-        files = [f for f in os.listdir(os.path.join(os.getcwd(), "metrics_out")) if f.endswith(".npz")]
+        with os.scandir(os.path.join(os.getcwd(), "metrics_out")) as it:
+            files = [e.name for e in it if e.is_file() and e.name.endswith(".npz")]
         print(files)
         if not files:
             raise FileNotFoundError("No .npz files found in metrics_out directory.")
-        for filename in files:
-            npz_path = os.path.join(os.getcwd(), "metrics_out", filename)
-            base_name = os.path.splitext(os.path.basename(npz_path))[0]
-            os.makedirs(out_dir, exist_ok=True)
-            try:
-                metrics = load_metrics(npz_path)
-            except Exception as e:
-                print(f"Error loading metrics from {npz_path}: {e}")
-                continue
-                
-            if plots is None:
-                plots = ["violin", "box", "heatmap", "clustermap"]
-
-            if "violin" in plots:
-                try:
-                    plot_violin(metrics, out=os.path.join(out_dir, f"{base_name}_violin.png"))
-                except Exception as e:
-                    print(f"Error creating violin plot for {base_name}: {e}")
-            if "box" in plots:
-                try:
-                    plot_box(metrics, out=os.path.join(out_dir, f"{base_name}_box.png"))
-                except Exception as e:
-                    print(f"Error creating box plot for {base_name}: {e}")
-            if "heatmap" in plots:
-                try:
-                    plot_heatmap_corr(metrics, out=os.path.join(out_dir, f"{base_name}_corr_heatmap.png"), annot=True)
-                except Exception as e:
-                    print(f"Error creating heatmap for {base_name}: {e}")
-            if "clustermap" in plots:
-                try:
-                    plot_clustermap(metrics, out=os.path.join(out_dir, f"{base_name}_clustermap.png"))
-                except Exception as e:
-                    print(f"Error creating clustermap for {base_name}: {e}")
-    else:
-        base_name = os.path.splitext(os.path.basename(npz_path))[0]
         os.makedirs(out_dir, exist_ok=True)
-        try:
-            metrics = load_metrics(npz_path)
-        except Exception as e:
-            print(f"Error loading metrics from {npz_path}: {e}")
-            return
-            
-        if plots is None:
-            plots = ["violin", "box", "heatmap", "clustermap"]
-
-        if "violin" in plots:
-            try:
-                plot_violin(metrics, out=os.path.join(out_dir, f"{base_name}_violin.png"))
-            except Exception as e:
-                print(f"Error creating violin plot for {base_name}: {e}")
-        if "box" in plots:
-            try:
-                plot_box(metrics, out=os.path.join(out_dir, f"{base_name}_box.png"))
-            except Exception as e:
-                print(f"Error creating box plot for {base_name}: {e}")
-        if "heatmap" in plots:
-            try:
-                plot_heatmap_corr(metrics, out=os.path.join(out_dir, f"{base_name}_corr_heatmap.png"), annot=True)
-            except Exception as e:
-                print(f"Error creating heatmap for {base_name}: {e}")
-        if "clustermap" in plots:
-            try:
-                plot_clustermap(metrics, out=os.path.join(out_dir, f"{base_name}_clustermap.png"))
-            except Exception as e:
-                print(f"Error creating clustermap for {base_name}: {e}")
+        paths = [os.path.join(os.getcwd(), "metrics_out", filename) for filename in files]
+        # each file is plotted independently, so spread them over processes
+        with multiprocessing.Pool(processes=min(len(paths), os.cpu_count() or 1)) as pool:
+            pool.starmap(_process_one, [(path, out_dir, plots) for path in paths])
+    else:
+        _process_one(npz_path, out_dir, plots)
 
 if __name__ == "__main__":
     # simple CLI: set METRICS_NPZ and comma-separated PLOTS env vars or edit defaults here
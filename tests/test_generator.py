@@ -1,11 +1,17 @@
 import unittest
 import sys
 import os
+from unittest import mock
 
 # Add the src directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from network_metrics_package.metrics.generator import _metric_per_component_mapped
+import graph_tool.all as gt
+from network_metrics_package.metrics import generator
+from network_metrics_package.metrics.generator import (
+    _metric_per_component_mapped, _trust_transitivity_call, _katz_call,
+    _balanced_chunks, _betweenness_pivots, _accepts_weight
+)
 import numpy as np
 
 class TestMetricsGenerator(unittest.TestCase):
@@ -15,5 +21,83 @@ class TestMetricsGenerator(unittest.TestCase):
         # Note: This is a simplified test - in practice, you'd want to create a mock graph
         pass
 
+    def _assert_matches_direct_trust_transitivity(self, G):
+        # the whole graph is one component, so mapping must not change the values
+        trust = G.new_edge_property("double", val=1.0)
+        expected = np.asarray(_trust_transitivity_call(G, trust).a, dtype=float)
+        mapped = _metric_per_component_mapped(G, _trust_transitivity_call, weight=trust)
+        np.testing.assert_allclose(mapped, expected)
+
+    def test_trust_transitivity_isolated_vertex(self):
+        G = gt.Graph(directed=False)
+        G.add_vertex()
+        self._assert_matches_direct_trust_transitivity(G)
+
+    def test_trust_transitivity_dyad(self):
+        G = gt.Graph(directed=False)
+        G.add_vertex(2)
+        G.add_edge(0, 1)
+        self._assert_matches_direct_trust_transitivity(G)
+
+    def test_process_pool_matches_sequential(self):
+        # three path components of three vertices each
+        G = gt.Graph(directed=False)
+        G.add_vertex(9)
+        for s in (0, 3, 6):
+            G.add_edge(s, s + 1)
+            G.add_edge(s + 1, s + 2)
+        expected = _metric_per_component_mapped(G, _katz_call)
+        # the sequential fallback logs a warning, so none may be emitted
+        with mock.patch.object(generator.logger, "warning") as warning:
+            parallel = _metric_per_component_mapped(G, _katz_call, workers=2, nthreads=2)
+        warning.assert_not_called()
+        np.testing.assert_allclose(parallel, expected)
+
+class TestGeneratorHelpers(unittest.TestCase):
+
+    def test_balanced_chunks(self):
+        components = [np.arange(n) for n in (100, 50, 50, 10, 10, 3)]
+        chunks = _balanced_chunks(components, 2)
+        self.assertEqual(len(chunks), 2)
+        # every component lands in exactly one chunk
+        self.assertEqual(sorted(c.size for chunk in chunks for c in chunk), [3, 10, 10, 50, 50, 100])
+        # the largest component is alone against the rest
+        self.assertEqual(sorted(len(chunk) for chunk in chunks), [1, 5])
+        # empty chunks are dropped
+        self.assertEqual(len(_balanced_chunks(components[:1], 4)), 1)
+
+    def test_betweenness_pivots(self):
+        pivots = _betweenness_pivots(100000, 0.1)
+        self.assertEqual(pivots.size, int(np.ceil(np.log(100000) / 0.01)))
+        self.assertEqual(np.unique(pivots).size, pivots.size)
+        self.assertTrue(np.all(np.diff(pivots) > 0))
+        self.assertTrue(0 <= pivots[0] and pivots[-1] < 100000)
+        np.testing.assert_array_equal(pivots, _betweenness_pivots(100000, 0.1))
+        # a sample as large as the graph means exact betweenness
+        self.assertIsNone(_betweenness_pivots(1000, 0.05))
+        for eps in (0, -0.1):
+            with self.assertRaises(ValueError):
+                _betweenness_pivots(100000, eps)
+
+    def test_accepts_weight(self):
+        self.assertTrue(_accepts_weight(lambda g, w=None: None))
+        self.assertTrue(_accepts_weight(lambda *args: None))
+        self.assertTrue(_accepts_weight(_katz_call))
+        self.assertFalse(_accepts_weight(lambda g: None))
+        self.assertFalse(_accepts_weight(lambda g, *, weight=None: None))
+    def test_compute_and_save_metrics_runs_every_metric(self):
+        G = gt.Graph(directed=False)
+        G.add_vertex(6)
+        for s, t in ((0, 1), (1, 2), (2, 0), (3, 4)):
+            G.add_edge(s, t)
+        # a failing metric is logged and replaced by NaN, so no warning may be emitted
+        with mock.patch.object(generator.logger, "warning") as warning:
+            metrics, npz_path, csv_path = generator.compute_and_save_metrics(G, save_files=False, nthreads=1)
+        warning.assert_not_called()
+        self.assertIsNone(npz_path)
+        self.assertIsNone(csv_path)
+        for name, values in metrics.items():
+            self.assertEqual(values.shape, (6,), name)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,11 +1,15 @@
 import pytest
 import sys
 import os
+import zipfile
+import numpy as np
+import pandas as pd
 
 # Add the src directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from network_metrics_package.plotting.compare_plots import plot_violin, plot_box
+from network_metrics_package.plotting.compare_plots import plot_violin, plot_box, save_plot, load_metrics, _mmap_npz_member
+from network_metrics_package.plotting.compare_plots import _quartiles_whiskers, _spearman_corr
 
 def test_plot_violin():
     # Example data for testing
@@ -35,4 +39,85 @@ def test_plot_box():
     assert os.path.exists(filename)  # Ensure the file exists after saving
     
     # Clean up
-    os.remove(filename)  # Remove the test file after the test
\ No newline at end of file
+    os.remove(filename)  # Remove the test file after the test
+
+def _npz_members(npz_path):
+    with np.load(npz_path, allow_pickle=True) as data:
+        return {k: data[k] for k in data.files}
+
+
+def test_mmap_npz_member_uncompressed(tmp_path):
+    arrays = {'a': np.arange(10, dtype=np.float64), 'b': np.asfortranarray(np.ones((3, 4), dtype=np.float32)),
+              'c': np.arange(5)}
+    path = str(tmp_path / "m.npz")
+    np.savez(path, **arrays)
+    expected = _npz_members(path)
+    with zipfile.ZipFile(path) as zf:
+        for k in arrays:
+            mapped = _mmap_npz_member(path, zf, k + '.npy')
+            assert isinstance(mapped, np.memmap)
+            assert mapped.dtype == expected[k].dtype
+            np.testing.assert_array_equal(mapped, expected[k])
+    with load_metrics(path) as metrics:
+        assert sorted(metrics) == sorted(arrays)
+        assert all(isinstance(metrics[k], np.memmap) for k in arrays)
+
+
+def test_mmap_npz_member_compressed_falls_back(tmp_path):
+    path = str(tmp_path / "m.npz")
+    np.savez_compressed(path, a=np.linspace(0, 1, 7))
+    with zipfile.ZipFile(path) as zf:
+        assert _mmap_npz_member(path, zf, 'a.npy') is None
+    with load_metrics(path) as metrics:
+        assert not isinstance(metrics['a'], np.memmap)
+        np.testing.assert_array_equal(metrics['a'], np.linspace(0, 1, 7))
+
+
+def test_mmap_npz_member_empty_and_object(tmp_path):
+    path = str(tmp_path / "m.npz")
+    np.savez(path, empty=np.empty(0), obj=np.array([[1, 2], [3]], dtype=object))
+    with zipfile.ZipFile(path) as zf:
+        assert _mmap_npz_member(path, zf, 'empty.npy') is None
+        assert _mmap_npz_member(path, zf, 'obj.npy') is None
+    with load_metrics(path) as metrics:
+        assert metrics['empty'].shape == (0,)
+
+
+def test_load_metrics_close(tmp_path):
+    path = str(tmp_path / "m.npz")
+    np.savez(path, a=np.arange(3.0))
+    with load_metrics(path) as metrics:
+        a = metrics['a']
+    assert metrics._npz.zip is None
+    # arrays handed out before closing stay usable
+    np.testing.assert_array_equal(a, np.arange(3.0))
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 5, 15, 16, 17, 100, 1001])
+def test_quartiles_whiskers_match_percentile(n):
+    d = np.random.default_rng(n).standard_normal(n)
+    d[0] = 25.0  # an outlier beyond the upper whisker
+    q1, med, q3, lower, upper = _quartiles_whiskers(d.copy())
+    np.testing.assert_allclose([q1, med, q3], np.percentile(d, [25, 50, 75]))
+    iqr = q3 - q1
+    assert lower == min(max(q1 - 1.5 * iqr, d.min()), q1)
+    assert upper == min(max(q3 + 1.5 * iqr, q3), d.max())
+
+
+def test_spearman_corr_matches_pandas():
+    rng = np.random.default_rng(0)
+    # rounding creates ties, which must get average ranks
+    mat = np.round(rng.random((200, 4)) * 10)
+    mat[:, 1] = mat[:, 0] ** 2 + rng.random(200)
+    expected = pd.DataFrame(mat).corr('spearman').to_numpy()
+    np.testing.assert_allclose(_spearman_corr(mat), expected)
+
+
+def test_plot_violin_without_out_then_save_plot(tmp_path):
+    import matplotlib.image
+    filename = str(tmp_path / "violin.png")
+    plot_violin({'metric_a': [1, 2, 3, 4, 5], 'metric_b': [2, 3, 4, 5, 9]}, out=None)
+    save_plot(filename)
+    # an empty canvas would be a single colour
+    img = matplotlib.image.imread(filename)
+    assert len(np.unique(img.reshape(-1, img.shape[-1]), axis=0)) > 1
@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from network_metrics_package.metrics import utils
+from network_metrics_package.metrics.utils import _finalize, minmax_normalize
+
+CASES = {
+    "mixed": np.array([3.0, np.nan, -1.0, np.inf, 5.0, -np.inf, 1.0]),
+    "all_nan": np.full(4, np.nan),
+    "constant": np.full(5, 2.5),
+    "single": np.array([7.0]),
+}
+
+
+class TestNormalization(unittest.TestCase):
+
+    def test_minmax_normalize_values(self):
+        with mock.patch.object(utils, "_sanitize_and_normalize", None):
+            out = minmax_normalize(CASES["mixed"].copy())
+        np.testing.assert_allclose(out, [4 / 6, np.nan, 0.0, np.nan, 1.0, np.nan, 2 / 6])
+        with mock.patch.object(utils, "_sanitize_and_normalize", None):
+            self.assertTrue(np.isnan(minmax_normalize(CASES["all_nan"].copy())).all())
+            np.testing.assert_array_equal(minmax_normalize(CASES["constant"].copy()), 0.0)
+
+    def test_finalize_pads_and_truncates(self):
+        with mock.patch.object(utils, "_sanitize_and_normalize", None):
+            padded = _finalize(np.array([1.0, 3.0]), 4, normalize=True)
+            truncated = _finalize(np.arange(6.0), 3, normalize=False, dtype=np.float32)
+        np.testing.assert_allclose(padded, [0.0, 1.0, np.nan, np.nan])
+        np.testing.assert_array_equal(truncated, [0.0, 1.0, 2.0])
+        self.assertEqual(truncated.dtype, np.float32)
+
+    @unittest.skipIf(utils._sanitize_and_normalize is None, "numba not installed")
+    def test_numba_matches_numpy(self):
+        for name, arr in CASES.items():
+            for n in (arr.size - 1, arr.size, arr.size + 3):
+                for normalize in (True, False):
+                    with self.subTest(case=name, n=n, normalize=normalize):
+                        fast = _finalize(arr.copy(), n, normalize)
+                        with mock.patch.object(utils, "_sanitize_and_normalize", None):
+                            slow = _finalize(arr.copy(), n, normalize)
+                        np.testing.assert_allclose(fast, slow)
+            with self.subTest(case=name, fn="minmax_normalize"):
+                fast = minmax_normalize(arr.copy())
+                with mock.patch.object(utils, "_sanitize_and_normalize", None):
+                    slow = minmax_normalize(arr.copy())
+                np.testing.assert_allclose(fast, slow)
+
+if __name__ == '__main__':
+    unittest.main()